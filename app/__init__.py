@@ -24,4 +24,15 @@ def create_app():
     with app.app_context():
         db.create_all()
 
+        # Stats tables added to a database that already has movies start empty.
+        from app.stats import ensure_movie_stats
+        ensure_movie_stats()
+
+    # Usage: flask --app run rebuild-stats
+    @app.cli.command("rebuild-stats")
+    def rebuild_stats_command():
+        """Recompute the movie stats tables from the movie table."""
+        from app.stats import rebuild_movie_stats
+        rebuild_movie_stats()
+
     return app
@@ -14,4 +14,50 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     API_TOKEN = os.environ.get("API_TOKEN")
+    # Seconds to wait on TMDB before a request counts as a (retryable) timeout.
+    REQUEST_TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", 10))
+
+    # Scraper job manager: number of jobs run at once and the request budget
+    # (requests per second against TMDB) shared by every running job.
+    SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", 2))
+    SCRAPER_MAX_REQUESTS_PER_SECOND = int(
+        os.environ.get("SCRAPER_MAX_REQUESTS_PER_SECOND", 40))
+    # Seconds between heartbeats of queued/running jobs, and how stale a
+    # heartbeat may get before the job is considered orphaned and failed.
+    SCRAPER_HEARTBEAT_INTERVAL = float(
+        os.environ.get("SCRAPER_HEARTBEAT_INTERVAL", 30))
+    SCRAPER_ORPHAN_TIMEOUT = float(
+        os.environ.get("SCRAPER_ORPHAN_TIMEOUT", 300))
+
+    # Retry queue for transient failures: delays are in seconds and double on
+    # every attempt, up to RETRY_MAX_DELAY, until RETRY_MAX_ATTEMPTS is reached.
+    RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", 8))
+    RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", 30))
+    RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", 6 * 60 * 60))
+
+    # Circuit breaker: pause fetching for CIRCUIT_BREAKER_COOLDOWN seconds when
+    # at least CIRCUIT_BREAKER_ERROR_RATE of the last CIRCUIT_BREAKER_WINDOW
+    # requests failed transiently.
+    CIRCUIT_BREAKER_WINDOW = int(os.environ.get("CIRCUIT_BREAKER_WINDOW", 50))
+    CIRCUIT_BREAKER_ERROR_RATE = float(
+        os.environ.get("CIRCUIT_BREAKER_ERROR_RATE", 0.5))
+    CIRCUIT_BREAKER_COOLDOWN = float(
+        os.environ.get("CIRCUIT_BREAKER_COOLDOWN", 60))
+
+    # Optional poster/backdrop mirroring after each movie upsert. Sizes are
+    # comma separated TMDB size names, e.g. "w342,w500,original".
+    IMAGE_MIRROR_ENABLED = os.environ.get(
+        "IMAGE_MIRROR_ENABLED", "False").lower() in ["true", "1"]
+    IMAGE_MIRROR_DIR = os.environ.get("IMAGE_MIRROR_DIR", "data/images")
+    IMAGE_BASE_URL = os.environ.get(
+        "IMAGE_BASE_URL", "https://image.tmdb.org/t/p")
+    IMAGE_POSTER_SIZES = [size for size in os.environ.get(
+        "IMAGE_POSTER_SIZES", "w500").split(",") if size]
+    IMAGE_BACKDROP_SIZES = [size for size in os.environ.get(
+        "IMAGE_BACKDROP_SIZES", "w1280").split(",") if size]
+    IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", 8))
+    IMAGE_MAX_REQUESTS_PER_SECOND = int(
+        os.environ.get("IMAGE_MAX_REQUESTS_PER_SECOND", 20))
+    # Downloads that may be queued or in flight before submitting blocks.
+    IMAGE_QUEUE_SIZE = int(os.environ.get("IMAGE_QUEUE_SIZE", 500))
     SQLALCHEMY_ECHO = True
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from app.config import Config
+from app.logger import logger
+from app.manager import RateBudget
+
+
+class ImageMirror:
+    """
+    Mirrors TMDB poster and backdrop images to local disk.
+
+    Downloads run concurrently on their own thread pool and rate budget, so the
+    scraper that queued them does not wait for individual downloads. Files are
+    stored content-addressed (<sha256[:2]>/<sha256[2:4]>/<sha256><ext>), so
+    identical images fetched under different paths or sizes are only written once. An append-only JSON lines
+    index maps "<size><image_path>" to the stored file and lets already mirrored
+    images be skipped without touching the network. At most queue_size downloads
+    are queued or in flight; submitting beyond that blocks, which slows the
+    scraper to the pace of the mirror instead of growing the queue forever.
+    """
+
+    def __init__(self, directory=Config.IMAGE_MIRROR_DIR, base_url=Config.IMAGE_BASE_URL,
+                 poster_sizes=Config.IMAGE_POSTER_SIZES,
+                 backdrop_sizes=Config.IMAGE_BACKDROP_SIZES,
+                 workers=Config.IMAGE_WORKERS,
+                 max_requests_per_second=Config.IMAGE_MAX_REQUESTS_PER_SECOND,
+                 queue_size=Config.IMAGE_QUEUE_SIZE):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        self.sizes = {
+            "poster_path": poster_sizes,
+            "backdrop_path": backdrop_sizes,
+        }
+        self.budget = RateBudget(max_requests_per_second)
+        self.budget.register("images")
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="image-mirror")
+        self._slots = threading.BoundedSemaphore(queue_size)
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.index_path = os.path.join(self.directory, "index.jsonl")
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._pending = set()
+        self.downloaded = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def _load_index(self):
+        index = {}
+        if not os.path.exists(self.index_path):
+            return index
+        with open(self.index_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write; that image is refetched.
+                    continue
+                index[entry["key"]] = entry
+        logger.info(f"Loaded {len(index)} mirrored images from {self.index_path}")
+        return index
+
+    @staticmethod
+    def key(size, image_path):
+        return f"{size}{image_path}"
+
+    def submit(self, data):
+        """Queue every configured size of the movie's poster and backdrop."""
+        for field, sizes in self.sizes.items():
+            image_path = data.get(field)
+            if not image_path:
+                continue
+            for size in sizes:
+                self.submit_image(size, image_path)
+
+    def submit_image(self, size, image_path):
+        key = self.key(size, image_path)
+        with self._lock:
+            if key in self._index or key in self._pending:
+                self.skipped += 1
+                return None
+            self._pending.add(key)
+        # Outside the lock: blocks while queue_size downloads are outstanding.
+        self._slots.acquire()
+        try:
+            return self.executor.submit(self._download, size, image_path)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self._pending.discard(key)
+            raise
+
+    def _download(self, size, image_path):
+        key = self.key(size, image_path)
+        url = f"{self.base_url}/{size}{image_path}"
+        try:
+            self.budget.acquire("images")
+            response = requests.get(url, timeout=Config.REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                logger.error(
+                    f"Image {url} returned status code: {response.status_code}")
+                with self._lock:
+                    self.failed += 1
+                return None
+
+            content = response.content
+            digest = hashlib.sha256(content).hexdigest()
+            extension = os.path.splitext(image_path)[1]
+            relative_path = os.path.join(
+                digest[:2], digest[2:4], f"{digest}{extension}")
+            full_path = os.path.join(self.directory, relative_path)
+
+            if os.path.exists(full_path):
+                with self._lock:
+                    self.deduplicated += 1
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                # Write to a temporary name first so a crash never leaves a partial image.
+                temp_path = f"{full_path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(content)
+                os.replace(temp_path, full_path)
+                with self._lock:
+                    self.downloaded += 1
+
+            self._record(key, digest, relative_path)
+            logger.debug(f"Mirrored image {url} to {relative_path}")
+            return full_path
+        except Exception as e:
+            logger.error(f"Error mirroring image {url}: {e}")
+            with self._lock:
+                self.failed += 1
+            return None
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+            self._slots.release()
+
+    def _record(self, key, digest, relative_path):
+        entry = {"key": key, "sha256": digest, "file": relative_path}
+        with self._lock:
+            self._index[key] = entry
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def path_for(self, size, image_path):
+        """Absolute path of the mirrored image, or None if it is not mirrored."""
+        with self._lock:
+            entry = self._index.get(self.key(size, image_path))
+        if entry:
+            return os.path.abspath(os.path.join(self.directory, entry["file"]))
+        return None
+
+    def status(self):
+        with self._lock:
+            return {
+                "indexed": len(self._index),
+                "pending": len(self._pending),
+                "downloaded": self.downloaded,
+                "deduplicated": self.deduplicated,
+                "skipped": self.skipped,
+                "failed": self.failed,
+            }
+
+
+_image_mirror = None
+_image_mirror_lock = threading.Lock()
+
+
+def get_image_mirror():
+    """
+    The process-wide ImageMirror, or None when mirroring is disabled.
+
+    Created on first use so importing the module has no side effects.
+    """
+    global _image_mirror
+    if not Config.IMAGE_MIRROR_ENABLED:
+        return None
+    with _image_mirror_lock:
+        if _image_mirror is None:
+            _image_mirror = ImageMirror()
+    return _image_mirror
@@ -0,0 +1,269 @@
+import itertools
+import queue
+from collections import deque
+import threading
+import time
+from app.config import Config
+from app.logger import logger
+
+
+class RateBudget:
+    """
+    Process-wide request budget shared by all running scraper jobs.
+
+    The budget is split max-min fairly: every active job gets an equal share of
+    max_requests_per_second, except jobs whose own max_requests_per_second is
+    lower, whose unused share is handed to the remaining jobs.
+    """
+
+    def __init__(self, max_requests_per_second):
+        self.max_requests_per_second = max_requests_per_second
+        self._lock = threading.Lock()
+        self._active = {}  # job _id -> the job's own requests-per-second cap
+        self._next_slot = {}  # job _id -> monotonic time of its next request
+
+    def register(self, job_id, job_max_requests_per_second=None):
+        with self._lock:
+            self._active[job_id] = job_max_requests_per_second
+            self._next_slot[job_id] = time.monotonic()
+
+    def release(self, job_id):
+        with self._lock:
+            self._active.pop(job_id, None)
+            self._next_slot.pop(job_id, None)
+
+    def _shares(self):
+        # Water-filling: serve the smallest caps first, split what is left evenly.
+        shares = {}
+        remaining = float(self.max_requests_per_second)
+        jobs = sorted(self._active.items(),
+                      key=lambda item: item[1] or float("inf"))
+        for index, (job_id, cap) in enumerate(jobs):
+            fair = remaining / (len(jobs) - index)
+            share = min(cap, fair) if cap else fair
+            shares[job_id] = share
+            remaining -= share
+        return shares
+
+    def shares(self):
+        with self._lock:
+            return self._shares()
+
+    def acquire(self, job_id):
+        """Block until job_id may send its next request."""
+        with self._lock:
+            share = self._shares().get(job_id)
+            now = time.monotonic()
+            if not share:
+                # Unregistered jobs are paced as if they were the only job.
+                share = self.max_requests_per_second
+            slot = max(now, self._next_slot.get(job_id, now))
+            self._next_slot[job_id] = slot + 1.0 / share
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Pauses fetching when the upstream error rate spikes.
+
+    Closed: requests flow and their outcomes are recorded. Once the window is
+    full and the share of failures reaches error_rate, the breaker opens and
+    wait() blocks for cooldown seconds. After that it is half-open: exactly one
+    caller is let through as a probe while everyone else keeps waiting, and the
+    probe's outcome either closes the breaker (success) or opens it again
+    (failure). A probe that reports nothing within cooldown seconds is replaced.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window=Config.CIRCUIT_BREAKER_WINDOW,
+                 error_rate=Config.CIRCUIT_BREAKER_ERROR_RATE,
+                 cooldown=Config.CIRCUIT_BREAKER_COOLDOWN):
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._probe_thread = None  # ident of the caller sent as the half-open probe
+        self._probe_started = None
+
+    def _open(self):
+        self._probe_thread = None
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._outcomes.clear()
+        logger.warning(
+            f"Circuit breaker opened; pausing fetches for {self.cooldown:.0f} seconds.")
+
+    def record(self, success):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if success:
+                    self.state = self.CLOSED
+                    self._probe_thread = None
+                    logger.info("Circuit breaker closed.")
+                else:
+                    self._open()
+                self._changed.notify_all()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (self.state == self.CLOSED
+                    and len(self._outcomes) == self._outcomes.maxlen
+                    and failures / len(self._outcomes) >= self.error_rate):
+                self._open()
+
+    def _start_probe(self):
+        self.state = self.HALF_OPEN
+        self._probe_thread = threading.get_ident()
+        self._probe_started = time.monotonic()
+
+    def wait(self):
+        """Block while the breaker is open, or half-open with a probe in flight."""
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.OPEN:
+                    remaining = self.opened_at + self.cooldown - now
+                    if remaining <= 0:
+                        self._start_probe()
+                        return
+                else:
+                    # The probe itself may come back, e.g. to retry after a 429.
+                    if self._probe_thread == threading.get_ident():
+                        return
+                    remaining = self._probe_started + self.cooldown - now
+                    if remaining <= 0:
+                        self._start_probe()
+                        return
+                self._changed.wait(remaining)
+
+    def status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "recent_failures": self._outcomes.count(False),
+                "recent_requests": len(self._outcomes),
+            }
+
+
+class JobManager:
+    """
+    Runs scraper jobs from a priority queue on a bounded pool of worker threads.
+
+    Higher priority jobs are started first; jobs with equal priority run in
+    submission order. All jobs draw their requests from one shared RateBudget
+    and stop together behind one shared CircuitBreaker.
+    """
+
+    def __init__(self, workers=Config.SCRAPER_WORKERS,
+                 max_requests_per_second=Config.SCRAPER_MAX_REQUESTS_PER_SECOND):
+        self.workers = workers
+        self.budget = RateBudget(max_requests_per_second)
+        self.breaker = CircuitBreaker()
+        self.queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._heartbeat_thread = None
+        self._queued = {}  # record _id -> Scraper waiting for a worker
+        self._running = {}  # record _id -> Scraper currently running
+
+    def start(self):
+        # Workers are started lazily so importing the module has no side effects.
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"scraper-worker-{len(self._threads) + 1}")
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat, name="scraper-heartbeat")
+                self._heartbeat_thread.daemon = True
+                self._heartbeat_thread.start()
+
+    def submit(self, scraper_instance, priority=0):
+        scraper_instance.rate_budget = self.budget
+        scraper_instance.circuit_breaker = self.breaker
+        job_id = scraper_instance.record._id
+        with self._lock:
+            self._queued[job_id] = scraper_instance
+        self.queue.put((-priority, next(self._counter), job_id, scraper_instance))
+        logger.info(
+            f"Queued scraper record {job_id} with priority {priority}.")
+        self.start()
+        return scraper_instance
+
+    def _worker(self):
+        while True:
+            _, _, job_id, scraper_instance = self.queue.get()
+            try:
+                self._run(job_id, scraper_instance)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job_id, scraper_instance):
+        with self._lock:
+            self._queued.pop(job_id, None)
+            self._running[job_id] = scraper_instance
+        self.budget.register(job_id, scraper_instance.max_requests_per_second)
+        try:
+            scraper_instance.run()
+        except Exception as e:
+            logger.error(f"Scraper record {job_id} failed: {e}")
+        finally:
+            self.budget.release(job_id)
+            with self._lock:
+                self._running.pop(job_id, None)
+
+    def _heartbeat(self):
+        # Imported here: app.scraper imports this module.
+        from app import create_app
+        from app.scraper import ScraperRecord
+
+        app = create_app()
+        while True:
+            time.sleep(Config.SCRAPER_HEARTBEAT_INTERVAL)
+            try:
+                with app.app_context():
+                    ScraperRecord.touch(self.queued_ids() + self.running_ids())
+                    # Also clean up after any other process that died.
+                    ScraperRecord.fail_orphaned()
+            except Exception as e:
+                logger.error(f"Scraper heartbeat failed: {e}")
+
+    def queued_ids(self):
+        with self._lock:
+            return list(self._queued)
+
+    def running_ids(self):
+        with self._lock:
+            return list(self._running)
+
+    def status(self):
+        shares = self.budget.shares()
+        return {
+            "workers": self.workers,
+            "max_requests_per_second": self.budget.max_requests_per_second,
+            "queued": self.queued_ids(),
+            "running": self.running_ids(),
+            "shares": {str(job_id): round(share, 2) for job_id, share in shares.items()},
+            "circuit_breaker": self.breaker.status(),
+        }
+
+
+job_manager = JobManager()
@@ -16,6 +16,10 @@ class BaseModel(db.Model):
     )
     _deleted_at = db.Column(db.DateTime, nullable=True)
 
+    # Models that keep derived data in step set this and override _save. Only
+    # they pay for the before/after snapshots, which can cost a reload SELECT.
+    tracks_changes = False
+
     @classmethod
     def _filter_valid_data(cls, data):
         allowed_keys = {col.name for col in cls.__table__.columns}
@@ -36,7 +40,10 @@ class BaseModel(db.Model):
         filtered_data = cls._filter_valid_data(data)
         obj = cls(**filtered_data)
         db.session.add(obj)
-        db.session.commit()
+        if cls.tracks_changes:
+            obj._save(None, obj.to_dict())
+        else:
+            db.session.commit()
         return obj
 
     @classmethod
@@ -59,12 +66,32 @@ class BaseModel(db.Model):
 
     def update(self, data):
         logger.info(f"Update called on {self} with data={data}")
+        previous = self.to_dict() if self.tracks_changes else None
         filtered_data = self._filter_valid_data(data)
         for key, value in filtered_data.items():
             setattr(self, key, value)
-        db.session.commit()
+        if self.tracks_changes:
+            self._save(previous, self.to_dict())
+        else:
+            db.session.commit()
         return self
 
     def delete(self):
+        previous = self.to_dict() if self.tracks_changes else None
         db.session.delete(self)
+        if self.tracks_changes:
+            self._save(previous, None)
+        else:
+            db.session.commit()
+
+    def to_dict(self):
+        return {col.name: getattr(self, col.name) for col in self.__table__.columns}
+
+    def _save(self, previous, current):
+        """
+        Commit the pending change of a tracks_changes model. previous and current
+        are the column values before and after it (previous is None on create,
+        current on delete), so subclasses can keep derived data in step within
+        the same transaction.
+        """
         db.session.commit()
@@ -2,6 +2,7 @@ from datetime import datetime
 import json
 from app import db
 from app.model import BaseModel
+from app.stats import apply_movie_stats, stats_lock
 
 
 class Movie(BaseModel):
@@ -27,3 +28,11 @@ class Movie(BaseModel):
     video = db.Column(db.Boolean)
     vote_average = db.Column(db.Float)
     vote_count = db.Column(db.Integer)
+
+    tracks_changes = True
+
+    def _save(self, previous, current):
+        # Keep the per-language and per-year stats tables in the same transaction.
+        with stats_lock:
+            apply_movie_stats(previous, current)
+            super()._save(previous, current)
@@ -0,0 +1,59 @@
+import random
+from datetime import datetime, timedelta
+from app import db
+from app.config import Config
+from app.model import BaseModel
+
+
+class Retry(BaseModel):
+    __tablename__ = "retry"
+
+    # Movie ID whose fetch failed transiently (5xx, timeout, connection error).
+    movie_id = db.Column(db.Integer, unique=True, nullable=False)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    # Set once attempts reaches RETRY_MAX_ATTEMPTS; the ID is no longer retried.
+    exhausted = db.Column(db.Boolean, default=False)
+
+    @staticmethod
+    def backoff(attempts):
+        """Exponential backoff with jitter: half the delay is fixed, half random."""
+        delay = min(Config.RETRY_MAX_DELAY,
+                    Config.RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+        return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+    @classmethod
+    def schedule(cls, movie_id, error):
+        record = cls.get("movie_id", movie_id)
+        attempts = (record.attempts if record else 0) + 1
+        data = {
+            "movie_id": movie_id,
+            "attempts": attempts,
+            "next_attempt_at": datetime.utcnow() + cls.backoff(attempts),
+            "last_error": str(error),
+            "exhausted": attempts >= Config.RETRY_MAX_ATTEMPTS,
+        }
+        if record:
+            return record.update(data)
+        return cls.create(data)
+
+    @classmethod
+    def pending(cls):
+        return cls.query.filter(cls.exhausted.is_(False))
+
+    @classmethod
+    def due(cls, limit=None):
+        query = cls.pending().filter(cls.next_attempt_at <= datetime.utcnow()) \
+            .order_by(cls.next_attempt_at)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @classmethod
+    def counts(cls):
+        return {
+            "pending": cls.pending().count(),
+            "due": cls.pending().filter(cls.next_attempt_at <= datetime.utcnow()).count(),
+            "exhausted": cls.query.filter(cls.exhausted.is_(True)).count(),
+        }
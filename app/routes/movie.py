@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_file
+from app.image import get_image_mirror
 from app.movie import Movie
+from app.stats import MovieLanguageStats, MovieYearStats, rebuild_movie_stats
 
 movie = Blueprint('movie', __name__, url_prefix="/movie")
 
@@ -83,3 +85,68 @@ def get_movie_all():
         return jsonify(movies_data)
     else:
         return jsonify({"error": "Movie not found."}), 404
+
+
+@movie.route("image", methods=["GET"])
+def get_movie_image():
+    # Example usage: /movie/image?size=w500&path=/kqjL17yufvn9OVLyXYpvtyrFfak.jpg
+    size = request.args.get("size")
+    path = request.args.get("path")
+    if not size or not path:
+        return jsonify({"error": "Both 'size' and 'path' query parameters are required."}), 400
+    image_mirror = get_image_mirror()
+    if image_mirror is None:
+        return jsonify({"error": "Image mirroring is not enabled."}), 404
+
+    file_path = image_mirror.path_for(size, path)
+    if file_path:
+        return send_file(file_path)
+    else:
+        return jsonify({"error": "Image not mirrored."}), 404
+
+
+@movie.route("stats", methods=["GET"])
+def get_movie_stats():
+    # Reads only the incrementally maintained stats tables, never the movie table.
+    # Example usage: /movie/stats, /movie/stats?language=en, /movie/stats?year=1999
+    language = request.args.get("language")
+    year = request.args.get("year")
+    if language or year:
+        if language:
+            stats = MovieLanguageStats.get("original_language", language)
+        else:
+            if not year.isdigit():
+                return jsonify({"error": "'year' must be a number."}), 400
+            stats = MovieYearStats.get("year", int(year))
+        if stats:
+            return jsonify(stats.stats_data())
+        else:
+            return jsonify({"error": "No stats found."}), 404
+
+    by_language = MovieLanguageStats.query.order_by(
+        MovieLanguageStats.movie_count.desc()).all()
+    by_year = MovieYearStats.query.order_by(MovieYearStats.year).all()
+    movie_count = sum(stats.movie_count for stats in by_year)
+    vote_average_count = sum(stats.vote_average_count for stats in by_year)
+    vote_average_total = sum(stats.vote_average_total for stats in by_year)
+    return jsonify({
+        "total": {
+            "movie_count": movie_count,
+            "revenue_total": sum(stats.revenue_total for stats in by_year),
+            "budget_total": sum(stats.budget_total for stats in by_year),
+            "vote_average": vote_average_total / vote_average_count if vote_average_count else None,
+            "vote_average_count": vote_average_count,
+        },
+        "by_language": [stats.stats_data() for stats in by_language],
+        "by_year": [stats.stats_data() for stats in by_year],
+    })
+
+
+@movie.route("stats/rebuild", methods=["POST"])
+def rebuild_movie_stats_route():
+    # Same as `flask --app run rebuild-stats`: recompute the stats tables to fix drift.
+    try:
+        rebuild_movie_stats()
+        return jsonify({"message": "Movie stats rebuilt."}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,48 +1,76 @@
 from flask import Blueprint, request, jsonify
+from app.image import get_image_mirror
+from app.manager import job_manager
+from app.retry import Retry
 from app.scraper import Scraper, ScraperRecord
-import threading
-
-# Global variable to store the current scraper instance.
-current_scraper_instance = None
 
 scraper = Blueprint("scraper", __name__, url_prefix="/scraper")
 
 
 def start_scraper(scrape_type):
-    global current_scraper_instance
     data = request.get_json(silent=True) or {}
     start_id = request.args.get("start_id", data.get("start_id", 1))
     end_id = request.args.get("end_id", data.get("end_id", 1000000000000))
     max_rps = request.args.get(
         "max_requests_per_second", data.get("max_requests_per_second", 30))
+    priority = request.args.get("priority", data.get("priority", 0))
 
     start_id = int(start_id)
     end_id = int(end_id)
     max_rps = int(max_rps)
+    priority = int(priority)
 
     scraper_instance = Scraper(
         start_id=start_id,
         end_id=end_id,
         max_requests_per_second=max_rps,
-        scrape_type=scrape_type
+        scrape_type=scrape_type,
+        priority=priority,
+        image_mirror=get_image_mirror()
     )
-    current_scraper_instance = scraper_instance
 
-    # Start scraper.run() in a new daemon thread so that the scraping runs in the background.
-    thread = threading.Thread(target=scraper_instance.run)
-    thread.daemon = True
-    thread.start()
-    return scraper_instance
+    # Keep the request's record: once queued, the worker reloads its own copy.
+    record = scraper_instance.record
+
+    # Queue the job; the job manager runs it on its worker pool when a worker is free.
+    job_manager.submit(scraper_instance, priority=priority)
+    return record
+
+
+def scraper_record_data(record):
+    return {
+        "_id": record._id,
+        "start_id": record.start_id,
+        "end_id": record.end_id,
+        "max_requests_per_second": record.max_requests_per_second,
+        "scrape_type": record.scrape_type,
+        "consecutive_invalid_threshold": record.consecutive_invalid_threshold,
+        "total_requests": record.total_requests,
+        "total_request_time": record.total_request_time,
+        "items_scraped": record.items_scraped,
+        "consecutive_invalid": record.consecutive_invalid,
+        "cancelled": record.cancelled,
+        "priority": record.priority,
+        "status": record.status,
+        "owner": record.owner,
+        "heartbeat_at": record.heartbeat_at.isoformat() if record.heartbeat_at else None,
+        "retries_scheduled": record.retries_scheduled,
+        "retries_recovered": record.retries_recovered,
+        "_created_at": record._created_at.isoformat() if record._created_at else None,
+        "_updated_at": record._updated_at.isoformat() if record._updated_at else None,
+        "_deleted_at": record._deleted_at.isoformat() if record._deleted_at else None,
+    }
 
 
 @scraper.route("/scrape", methods=["POST"])
 def trigger_scrape_alias():
     try:
-        scraper_instance = start_scraper("fresh")
+        record = start_scraper("fresh")
         return jsonify({
             "message": "Scraping started (fresh scan).",
             # Return ._id since there's no 'id' column
-            "scraper_record_id": scraper_instance.record._id
+            "scraper_record_id": record._id,
+            "status": record.status
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -51,10 +79,11 @@ def trigger_scrape_alias():
 @scraper.route("/fresh", methods=["POST"])
 def trigger_fresh_scraper():
     try:
-        scraper_instance = start_scraper("fresh")
+        record = start_scraper("fresh")
         return jsonify({
             "message": "Fresh scraping started.",
-            "scraper_record_id": scraper_instance.record._id
+            "scraper_record_id": record._id,
+            "status": record.status
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -63,15 +92,37 @@ def trigger_fresh_scraper():
 @scraper.route("/missing", methods=["POST"])
 def trigger_missing_scraper():
     try:
-        scraper_instance = start_scraper("missing")
+        record = start_scraper("missing")
         return jsonify({
             "message": "Missing scraping started.",
-            "scraper_record_id": scraper_instance.record._id
+            "scraper_record_id": record._id,
+            "status": record.status
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@scraper.route("/retry", methods=["POST"])
+def trigger_retry_scraper():
+    try:
+        record = start_scraper("retry")
+        return jsonify({
+            "message": "Retry scraping started.",
+            "scraper_record_id": record._id,
+            "status": record.status
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@scraper.route("/retry", methods=["GET"])
+def retry_status():
+    return jsonify({
+        "retry": Retry.counts(),
+        "circuit_breaker": job_manager.breaker.status()
+    }), 200
+
+
 @scraper.route("/cancel", methods=["POST"])
 def cancel_scraper():
     # Example usage: /scraper/cancel?key=_id&value=123
@@ -89,3 +140,37 @@ def cancel_scraper():
         }), 200
     else:
         return jsonify({"error": "No scraper record found matching the criteria."}), 404
+
+
+@scraper.route("/list", methods=["GET"])
+def list_scrapers():
+    # Optional filter, e.g. /scraper/list?status=running
+    status = request.args.get("status")
+    if status:
+        records = ScraperRecord.get_all("status", status)
+    else:
+        records = ScraperRecord.query.order_by(ScraperRecord._id).all()
+    image_mirror = get_image_mirror()
+    return jsonify({
+        "manager": job_manager.status(),
+        "retry": Retry.counts(),
+        "image_mirror": image_mirror.status() if image_mirror else None,
+        "scrapers": [scraper_record_data(record) for record in records]
+    }), 200
+
+
+@scraper.route("/status", methods=["GET"])
+def scraper_status():
+    # Example usage: /scraper/status?key=_id&value=123
+    key = request.args.get("key")
+    value = request.args.get("value")
+    if not key or not value:
+        return jsonify({"error": "Both 'key' and 'value' query parameters are required."}), 400
+
+    record = ScraperRecord.get(key, value)
+    if record:
+        record_data = scraper_record_data(record)
+        record_data["rate_share"] = job_manager.budget.shares().get(record._id)
+        return jsonify(record_data), 200
+    else:
+        return jsonify({"error": "No scraper record found matching the criteria."}), 404
@@ -1,11 +1,16 @@
 from app import db
 from app.model import BaseModel
+import os
+import socket
 import time
+from datetime import datetime, timedelta
 import requests
 from app.config import Config
 from app.logger import logger
 from app.movie import Movie
 from app.invalid import Invalid  # Existing invalid model
+from app.manager import CircuitBreaker
+from app.retry import Retry
 from app import db, create_app
 
 
@@ -22,22 +27,75 @@ class ScraperRecord(BaseModel):
     items_scraped = db.Column(db.Integer, default=0)
     consecutive_invalid = db.Column(db.Integer, default=0)
     cancelled = db.Column(db.Boolean, default=False)
+    priority = db.Column(db.Integer, default=0)
+    retries_scheduled = db.Column(db.Integer, default=0)
+    retries_recovered = db.Column(db.Integer, default=0)
+    # One of "queued", "running", "completed", "cancelled" or "failed".
+    status = db.Column(db.String(20), default="queued")
+    # "<hostname>:<pid>" of the process that owns the job, and the last time
+    # that process confirmed the job is still queued or running there.
+    owner = db.Column(db.String(255), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def process_owner():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def touch(cls, ids):
+        """Refresh the heartbeat of the given records."""
+        if not ids:
+            return 0
+        count = cls.query.filter(cls._id.in_(list(ids))).update(
+            {"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    @classmethod
+    def fail_orphaned(cls, timeout=Config.SCRAPER_ORPHAN_TIMEOUT):
+        """
+        Mark queued/running records whose heartbeat is older than timeout seconds as failed.
+
+        The job queue only lives in memory and its owner refreshes heartbeat_at
+        every SCRAPER_HEARTBEAT_INTERVAL, so a stale heartbeat means the owning
+        process is gone and the job will never finish.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+        orphaned = cls.query.filter(
+            cls.status.in_(["queued", "running"]),
+            db.or_(cls.heartbeat_at.is_(None), cls.heartbeat_at < cutoff))
+        count = orphaned.update({"status": "failed"}, synchronize_session=False)
+        db.session.commit()
+        if count:
+            logger.warning(
+                f"Marked {count} orphaned scraper records as failed.")
+        return count
 
 
 class Scraper:
     def __init__(self, start_id=1, end_id=1000000000000, max_requests_per_second=30,
-                 scrape_type="missing", consecutive_invalid_threshold=5000):
+                 scrape_type="missing", consecutive_invalid_threshold=5000,
+                 priority=0, rate_budget=None, circuit_breaker=None, image_mirror=None):
         """
         scrape_type options:
           - "missing": Only scrape movie IDs missing in the Movie table (and not marked as invalid).
           - "fresh": Scrape all IDs regardless of existing records, except those marked as invalid.
+          - "retry": Only re-fetch IDs from the retry queue whose backoff has elapsed.
         consecutive_invalid_threshold: number of consecutive 404 responses to consider as end-of-scrape.
+        priority: higher priority jobs are started first by the job manager.
+        rate_budget: shared RateBudget to draw requests from; set by the job manager.
+        circuit_breaker: shared CircuitBreaker; set by the job manager, otherwise one per scraper.
+        image_mirror: optional ImageMirror that poster/backdrop images are queued on after each upsert.
         """
         self.start_id = start_id
         self.end_id = end_id
         self.max_requests_per_second = max_requests_per_second
         self.scrape_type = scrape_type.lower()
         self.consecutive_invalid_threshold = consecutive_invalid_threshold
+        self.priority = priority
+        self.rate_budget = rate_budget
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.image_mirror = image_mirror
 
         self.headers = {
             "accept": "application/json",
@@ -51,9 +109,17 @@ class Scraper:
         self.total_requests = 0
         self.total_request_time = 0.0
 
+        # Track IDs sent to / recovered from the retry queue by this scraper.
+        self.retries_scheduled = 0
+        self.retries_recovered = 0
+
         # Track only the consecutive invalid IDs (current block).
         self.consecutive_invalid_ids = set()
 
+        # IDs in the retry table, refreshed with the known IDs, so a regular
+        # fetch can clear them without a retry lookup per movie.
+        self.retry_ids = set()
+
         # Create a scraper record in the DB (we have only _id).
         self.record = ScraperRecord.create({
             "start_id": self.start_id,
@@ -65,7 +131,13 @@ class Scraper:
             "total_request_time": 0.0,
             "items_scraped": 0,
             "consecutive_invalid": 0,
-            "cancelled": False
+            "cancelled": False,
+            "priority": self.priority,
+            "status": "queued",
+            "owner": ScraperRecord.process_owner(),
+            "heartbeat_at": datetime.utcnow(),
+            "retries_scheduled": 0,
+            "retries_recovered": 0
         })
         logger.info(f"Created scraper record with _id {self.record._id}")
 
@@ -86,6 +158,9 @@ class Scraper:
     def get_existing_movie_ids(self):
         return {m[0] for m in Movie.query.with_entities(Movie.id).all()}
 
+    def get_retry_ids(self):
+        return {r[0] for r in Retry.query.with_entities(Retry.movie_id).all()}
+
     def remove_consecutive_invalids(self):
         """Remove the invalid records created in the current consecutive block."""
         try:
@@ -102,108 +177,208 @@ class Scraper:
         except Exception as e:
             logger.error(f"Error removing invalid records: {e}")
 
+    def schedule_retry(self, movie_id, error):
+        """Put a transiently failed movie ID on the persistent retry queue."""
+        try:
+            retry = Retry.schedule(movie_id, error)
+            self.retries_scheduled += 1
+            if retry.exhausted:
+                logger.error(
+                    f"Movie ID {movie_id} failed {retry.attempts} times; giving up on retries.")
+            else:
+                logger.info(
+                    f"Movie ID {movie_id} queued for retry #{retry.attempts} at {retry.next_attempt_at}.")
+        except Exception as e:
+            logger.error(f"Error queueing retry for movie ID {movie_id}: {e}")
+
+    def clear_retry(self, movie_id, recovered):
+        """
+        Drop movie_id from the retry queue once it got a definitive answer.
+        recovered is True when the movie was stored, False when it turned out invalid.
+        """
+        try:
+            retry = Retry.get("movie_id", movie_id)
+            self.retry_ids.discard(movie_id)
+            if retry:
+                retry.delete()
+                if recovered:
+                    self.retries_recovered += 1
+                logger.info(f"Movie ID {movie_id} removed from the retry queue.")
+        except Exception as e:
+            logger.error(f"Error clearing retry for movie ID {movie_id}: {e}")
+
+    def process_retries(self, limit=None):
+        """Re-fetch the retry queue entries whose backoff has elapsed."""
+        # Collect the IDs first: fetch_movie deletes or updates the rows.
+        movie_ids = [retry.movie_id for retry in Retry.due(limit)]
+        for movie_id in movie_ids:
+            if self.check_cancelled():
+                return False
+            self.fetch_movie(movie_id, from_retry=True)
+            if self.rate_budget is None:
+                time.sleep(1.0 / self.max_requests_per_second)
+        return True
+
+    def mirror_images(self, movie_id, data):
+        """Queue the stored movie's images on the image mirror, if there is one."""
+        if self.image_mirror is None:
+            return
+        try:
+            self.image_mirror.submit(data)
+        except Exception as e:
+            # The movie itself is stored; only its images are missing.
+            logger.error(f"Error queueing images for movie ID {movie_id}: {e}")
+
+    def update_record_counters(self):
+        self.record.update({
+            "total_requests": self.total_requests,
+            "total_request_time": self.total_request_time,
+            "items_scraped": self.items_scraped,
+            "consecutive_invalid": self.consecutive_invalid,
+            "retries_scheduled": self.retries_scheduled,
+            "retries_recovered": self.retries_recovered
+        })
+
     def run(self):
         app = create_app()
         with app.app_context():
-            start_time = time.time()
-            refresh_interval = 100  # Refresh known IDs every 100 iterations.
-            iteration_count = 0  # total iterations (attempted IDs)
-            processed_count = 0  # IDs for which fetch_movie was actually called
-            self.items_scraped = 100
-            current_id = self.start_id
-            if self.scrape_type == "missing":
-                known_ids = self.get_existing_movie_ids().union(self.get_invalid_ids())
-                logger.info(
-                    f"Initial known IDs in 'missing' mode: {len(known_ids)}")
-            elif self.scrape_type == "fresh":
-                known_ids = self.get_invalid_ids()
+            # The record was created in the caller's session; reload it in ours.
+            self.record = ScraperRecord.get("_id", self.record._id)
+            if self.record.cancelled:
                 logger.info(
-                    f"Initial known IDs in 'fresh' mode: {len(known_ids)}")
-            else:
-                logger.error(
-                    "Invalid scrape_type provided. Use 'missing' or 'fresh'.")
+                    f"Scraper record {self.record._id} cancelled before it started.")
+                self.record.update({"status": "cancelled"})
                 return
+            self.record.update({"status": "running"})
+            try:
+                status = self.scrape()
+            except Exception:
+                self.record.update({"status": "failed"})
+                raise
+            self.record.update({"status": status})
 
-            while current_id <= self.end_id:
-                iteration_count += 1
-
-                # Periodically refresh known IDs
-                if iteration_count % refresh_interval == 0:
-                    if self.scrape_type == "missing":
-                        known_ids = self.get_existing_movie_ids().union(self.get_invalid_ids())
-                    elif self.scrape_type == "fresh":
-                        known_ids = self.get_invalid_ids()
-
-                    # Also update the scraper record every refresh interval
-                    self.record.update({
-                        "total_requests": self.total_requests,
-                        "total_request_time": self.total_request_time,
-                        "items_scraped": self.items_scraped,
-                        "consecutive_invalid": self.consecutive_invalid
-                    })
-
-                # Skip if known
-                if current_id in known_ids:
-                    current_id += 1
-                    continue
+    def scrape(self):
+        # Retry jobs do not walk a range; none of the setup below applies to them.
+        if self.scrape_type == "retry":
+            return self.scrape_retries()
 
-                # Check if externally cancelled
-                if self.check_cancelled():
-                    logger.info("Scraping cancelled via scraper record.")
-                    break
+        start_time = time.time()
+        refresh_interval = 100  # Refresh known IDs every 100 iterations.
+        iteration_count = 0  # total iterations (attempted IDs)
+        processed_count = 0  # IDs for which fetch_movie was actually called
+        self.items_scraped = 100
+        current_id = self.start_id
+        status = "completed"
+        if self.scrape_type == "missing":
+            known_ids = self.get_existing_movie_ids().union(self.get_invalid_ids())
+            logger.info(
+                f"Initial known IDs in 'missing' mode: {len(known_ids)}")
+        elif self.scrape_type == "fresh":
+            known_ids = self.get_invalid_ids()
+            logger.info(
+                f"Initial known IDs in 'fresh' mode: {len(known_ids)}")
+        else:
+            logger.error(
+                "Invalid scrape_type provided. Use 'missing', 'fresh' or 'retry'.")
+            return "failed"
+        self.retry_ids = self.get_retry_ids()
+
+        while current_id <= self.end_id:
+            iteration_count += 1
+
+            # Periodically refresh known IDs
+            if iteration_count % refresh_interval == 0:
+                if self.scrape_type == "missing":
+                    known_ids = self.get_existing_movie_ids().union(self.get_invalid_ids())
+                elif self.scrape_type == "fresh":
+                    known_ids = self.get_invalid_ids()
+                self.retry_ids = self.get_retry_ids()
+
+                # Also update the scraper record every refresh interval
+                self.update_record_counters()
 
-                # Fetch
-                self.fetch_movie(current_id)
-                processed_count += 1
+                # Give retry queue entries whose backoff has elapsed another go.
+                self.process_retries(limit=self.max_requests_per_second)
+
+            # Skip if known
+            if current_id in known_ids:
                 current_id += 1
+                continue
 
-                if processed_count % self.max_requests_per_second == 0:
-                    time.sleep(1)
+            # Check if externally cancelled
+            if self.check_cancelled():
+                logger.info("Scraping cancelled via scraper record.")
+                status = "cancelled"
+                break
 
-                if self.consecutive_invalid >= self.consecutive_invalid_threshold:
-                    logger.info(
-                        f"Encountered {self.consecutive_invalid} consecutive invalid errors. "
-                        f"Removing the consecutive invalid records and stopping further processing."
-                    )
-                    self.remove_consecutive_invalids()
-                    break
+            # Fetch
+            self.fetch_movie(current_id)
+            processed_count += 1
+            current_id += 1
 
-            elapsed_time = time.time() - start_time
-            rps = self.total_requests / elapsed_time if elapsed_time > 0 else 0
-            avg_req_time = self.total_request_time / \
-                self.total_requests if self.total_requests else 0
+            # Without a shared budget, fall back to pacing on our own limit.
+            if self.rate_budget is None and processed_count % self.max_requests_per_second == 0:
+                time.sleep(1)
 
-            logger.info(f"Movies scraped this session: {self.items_scraped}")
-            logger.info(
-                f"Processed movie IDs: {processed_count}, Skipped movie IDs: {iteration_count - processed_count}"
-            )
-            logger.info(
-                f"Total requests: {self.total_requests}, Elapsed time: {elapsed_time:.2f} seconds, "
-                f"Requests per second: {rps:.2f}, Average request time: {avg_req_time:.2f} seconds."
-            )
-
-            # Final record update at the end
-            self.record.update({
-                "total_requests": self.total_requests,
-                "total_request_time": self.total_request_time,
-                "items_scraped": self.items_scraped,
-                "consecutive_invalid": self.consecutive_invalid
-            })
-
-    def fetch_movie(self, movie_id):
+            if self.consecutive_invalid >= self.consecutive_invalid_threshold:
+                logger.info(
+                    f"Encountered {self.consecutive_invalid} consecutive invalid errors. "
+                    f"Removing the consecutive invalid records and stopping further processing."
+                )
+                self.remove_consecutive_invalids()
+                break
+
+        elapsed_time = time.time() - start_time
+        rps = self.total_requests / elapsed_time if elapsed_time > 0 else 0
+        avg_req_time = self.total_request_time / \
+            self.total_requests if self.total_requests else 0
+
+        logger.info(f"Movies scraped this session: {self.items_scraped}")
+        logger.info(
+            f"Processed movie IDs: {processed_count}, Skipped movie IDs: {iteration_count - processed_count}"
+        )
+        logger.info(
+            f"Total requests: {self.total_requests}, Elapsed time: {elapsed_time:.2f} seconds, "
+            f"Requests per second: {rps:.2f}, Average request time: {avg_req_time:.2f} seconds."
+        )
+
+        # Final record update at the end
+        self.update_record_counters()
+        return status
+
+    def scrape_retries(self):
+        """Make one pass over the retry queue entries that are due right now."""
+        # A single pass over a snapshot: IDs that fail again are rescheduled for
+        # later and must not be picked up again by this job.
+        if not self.process_retries():
+            logger.info("Retry scraping cancelled via scraper record.")
+            self.update_record_counters()
+            return "cancelled"
+        logger.info(
+            f"Retry queue processed: {self.retries_recovered} recovered, "
+            f"{self.retries_scheduled} rescheduled. Queue: {Retry.counts()}")
+        self.update_record_counters()
+        return "completed"
+
+    def fetch_movie(self, movie_id, from_retry=False):
         url = f"https://api.themoviedb.org/3/movie/{movie_id}?language=en-US"
         logger.debug(
             f"Starting fetch for movie ID {movie_id} using URL: {url}")
         while True:
             try:
+                self.circuit_breaker.wait()
+                if self.rate_budget is not None:
+                    self.rate_budget.acquire(self.record._id)
                 req_start = time.time()
-                response = requests.get(url, headers=self.headers)
+                response = requests.get(
+                    url, headers=self.headers, timeout=Config.REQUEST_TIMEOUT)
                 req_duration = time.time() - req_start
 
                 self.total_requests += 1
                 self.total_request_time += req_duration
 
                 if response.status_code == 200:
+                    self.circuit_breaker.record(True)
                     data = response.json()
                     try:
                         Movie.upsert("id", data)
@@ -215,9 +390,15 @@ class Scraper:
                         self.consecutive_invalid_ids.clear()
                         logger.info(
                             f"Movie ID {movie_id} stored/updated in database.")
+                        if from_retry or movie_id in self.retry_ids:
+                            self.clear_retry(movie_id, recovered=True)
                     except Exception as e:
                         logger.error(
                             f"Error storing movie ID {movie_id} in database: {e}")
+                        db.session.rollback()
+                        self.schedule_retry(movie_id, e)
+                    else:
+                        self.mirror_images(movie_id, data)
                     break
                 elif response.status_code == 429:
                     logger.error(
@@ -227,6 +408,9 @@ class Scraper:
                     time.sleep(30)
                     continue
                 elif response.status_code == 404:
+                    self.circuit_breaker.record(True)
+                    if from_retry or movie_id in self.retry_ids:
+                        self.clear_retry(movie_id, recovered=False)
                     logger.warning(
                         f"Movie ID {movie_id} returned 404. Storing as invalid.")
                     self.consecutive_invalid += 1
@@ -242,11 +426,16 @@ class Scraper:
                 else:
                     logger.error(
                         f"Movie ID {movie_id} returned status code: {response.status_code}")
+                    self.circuit_breaker.record(False)
+                    self.schedule_retry(
+                        movie_id, f"status code {response.status_code}")
                     self.consecutive_invalid = 0
                     self.consecutive_invalid_ids.clear()
                     break
             except Exception as e:
                 logger.error(f"Error fetching movie ID {movie_id}: {e}")
+                self.circuit_breaker.record(False)
+                self.schedule_retry(movie_id, e)
                 self.consecutive_invalid = 0
                 self.consecutive_invalid_ids.clear()
                 break
@@ -0,0 +1,181 @@
+import threading
+from sqlalchemy import func
+from app import db
+from app.logger import logger
+from app.model import BaseModel
+
+# Serialises stats writes within the process so two scraper threads never both
+# insert the first row for the same language or year.
+stats_lock = threading.Lock()
+
+STAT_COLUMNS = ["movie_count", "revenue_total", "budget_total",
+                "vote_average_total", "vote_average_count"]
+
+
+class MovieStats(BaseModel):
+    """Running totals over the movie table for one group (language or release year)."""
+    __abstract__ = True
+
+    movie_count = db.Column(db.Integer, default=0, nullable=False)
+    revenue_total = db.Column(db.BigInteger, default=0, nullable=False)
+    budget_total = db.Column(db.BigInteger, default=0, nullable=False)
+    # vote_average is summed over the movies that have one; the mean is total / count.
+    vote_average_total = db.Column(db.Float, default=0.0, nullable=False)
+    vote_average_count = db.Column(db.Integer, default=0, nullable=False)
+
+    # Name of the grouping column, set by subclasses.
+    group_key = None
+
+    @classmethod
+    def group_value(cls, values):
+        return values.get(cls.group_key)
+
+    @property
+    def vote_average(self):
+        if not self.vote_average_count:
+            return None
+        return self.vote_average_total / self.vote_average_count
+
+    def stats_data(self):
+        return {
+            self.group_key: getattr(self, self.group_key),
+            "movie_count": self.movie_count,
+            "revenue_total": self.revenue_total,
+            "budget_total": self.budget_total,
+            "vote_average": self.vote_average,
+            "vote_average_count": self.vote_average_count,
+        }
+
+
+class MovieLanguageStats(MovieStats):
+    __tablename__ = "movie_stats_language"
+
+    original_language = db.Column(db.String(10), unique=True, nullable=True)
+
+    group_key = "original_language"
+
+
+class MovieYearStats(MovieStats):
+    __tablename__ = "movie_stats_year"
+
+    year = db.Column(db.Integer, unique=True, nullable=True)
+
+    group_key = "year"
+
+    @classmethod
+    def group_value(cls, values):
+        return release_year(values.get("release_date"))
+
+
+def release_year(release_date):
+    """Year of a TMDB release_date ("YYYY-MM-DD"), or None when it is missing or malformed."""
+    if release_date and len(release_date) >= 4 and release_date[:4].isdigit():
+        return int(release_date[:4])
+    return None
+
+
+def movie_contribution(values):
+    """What one movie row adds to its group's totals."""
+    vote_average = values.get("vote_average")
+    return {
+        "movie_count": 1,
+        "revenue_total": values.get("revenue") or 0,
+        "budget_total": values.get("budget") or 0,
+        "vote_average_total": vote_average or 0.0,
+        "vote_average_count": 0 if vote_average is None else 1,
+    }
+
+
+def apply_movie_stats(previous, current):
+    """
+    Adjust the stats tables for one movie change without committing.
+
+    previous and current are the movie's column values before and after the
+    change (None on create / delete). The old contribution is subtracted from
+    its group and the new one added, so an update that moves a movie to another
+    language or year shifts it between groups, and one that changes nothing
+    touches no rows.
+    """
+    for stats_model in (MovieLanguageStats, MovieYearStats):
+        deltas = {}
+        for values, sign in ((previous, -1), (current, 1)):
+            if values is None:
+                continue
+            group = deltas.setdefault(stats_model.group_value(values), {})
+            for column, amount in movie_contribution(values).items():
+                group[column] = group.get(column, 0) + sign * amount
+
+        for group_value, delta in deltas.items():
+            delta = {column: amount for column, amount in delta.items() if amount}
+            if not delta:
+                continue
+            group_column = getattr(stats_model, stats_model.group_key)
+            # Increment in SQL so concurrent sessions never lose each other's updates.
+            updated = stats_model.query.filter(group_column == group_value).update(
+                {getattr(stats_model, column): getattr(stats_model, column) + amount
+                 for column, amount in delta.items()},
+                synchronize_session=False)
+            if updated and delta.get("movie_count", 0) < 0:
+                # The last movie left this group; drop it like a rebuild would.
+                stats_model.query.filter(group_column == group_value,
+                                         stats_model.movie_count <= 0) \
+                    .delete(synchronize_session=False)
+            elif not updated:
+                if delta.get("movie_count", 0) <= 0:
+                    # Only a new movie can start a group; anything else means the
+                    # tables missed earlier rows and would go negative.
+                    logger.warning(
+                        f"{stats_model.__tablename__} has no row for {group_value!r} to adjust; "
+                        f"stats are out of step with the movie table, run rebuild-stats.")
+                    continue
+                row = {column: 0 for column in STAT_COLUMNS}
+                row.update(delta)
+                row[stats_model.group_key] = group_value
+                db.session.add(stats_model(**row))
+
+
+def ensure_movie_stats():
+    """Build the stats tables when they are empty but movies already exist."""
+    from app.movie import Movie
+
+    if MovieYearStats.query.first() is None and Movie.query.first() is not None:
+        logger.info("Movie stats tables are empty; building them from the movie table.")
+        rebuild_movie_stats()
+
+
+def rebuild_movie_stats():
+    """Recompute the stats tables from scratch with GROUP BY scans over the movie table."""
+    from app.movie import Movie
+
+    aggregates = [
+        func.count(Movie._id),
+        func.coalesce(func.sum(Movie.revenue), 0),
+        func.coalesce(func.sum(Movie.budget), 0),
+        func.coalesce(func.sum(Movie.vote_average), 0.0),
+        func.count(Movie.vote_average),
+    ]
+    with stats_lock:
+        MovieLanguageStats.query.delete()
+        MovieYearStats.query.delete()
+
+        for language, *totals in db.session.query(Movie.original_language, *aggregates) \
+                .group_by(Movie.original_language):
+            row = dict(zip(STAT_COLUMNS, totals))
+            row["original_language"] = language
+            db.session.add(MovieLanguageStats(**row))
+
+        # Group on the raw "YYYY" prefix in SQL, then merge malformed prefixes into None.
+        year_rows = {}
+        prefix = func.substr(Movie.release_date, 1, 4)
+        for year_prefix, *totals in db.session.query(prefix, *aggregates).group_by(prefix):
+            year = release_year(year_prefix)
+            row = year_rows.setdefault(year, {column: 0 for column in STAT_COLUMNS})
+            for column, amount in zip(STAT_COLUMNS, totals):
+                row[column] += amount
+        for year, row in year_rows.items():
+            db.session.add(MovieYearStats(year=year, **row))
+
+        db.session.commit()
+    logger.info(
+        f"Rebuilt movie stats: {MovieLanguageStats.query.count()} languages, "
+        f"{MovieYearStats.query.count()} years.")
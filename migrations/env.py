@@ -9,6 +9,11 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# Use the application's database unless sqlalchemy.url is given explicitly.
+from app.config import Config  # noqa: E402
+if Config.SQLALCHEMY_DATABASE_URI:
+    config.set_main_option("sqlalchemy.url", Config.SQLALCHEMY_DATABASE_URI)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
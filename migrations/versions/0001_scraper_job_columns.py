@@ -0,0 +1,46 @@
+"""Add scraper job priority and status
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {col["name"] for col in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created after this change already get the columns from create_all.
+    existing = _columns("scraper")
+    if existing is None:
+        return
+    if "priority" not in existing:
+        op.add_column("scraper", sa.Column(
+            "priority", sa.Integer(), nullable=True, server_default="0"))
+    if "status" not in existing:
+        # Jobs from before the job manager have all finished one way or another.
+        op.add_column("scraper", sa.Column(
+            "status", sa.String(length=20), nullable=True, server_default="completed"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scraper", "status")
+    op.drop_column("scraper", "priority")
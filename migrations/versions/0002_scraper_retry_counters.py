@@ -0,0 +1,43 @@
+"""Add scraper retry counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {col["name"] for col in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The retry table itself is new and is created by create_all.
+    existing = _columns("scraper")
+    if existing is None:
+        return
+    for name in ("retries_scheduled", "retries_recovered"):
+        if name not in existing:
+            op.add_column("scraper", sa.Column(
+                name, sa.Integer(), nullable=True, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scraper", "retries_recovered")
+    op.drop_column("scraper", "retries_scheduled")
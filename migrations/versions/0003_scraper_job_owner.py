@@ -0,0 +1,45 @@
+"""Add scraper job owner and heartbeat
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {col["name"] for col in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = _columns("scraper")
+    if existing is None:
+        return
+    if "owner" not in existing:
+        op.add_column("scraper", sa.Column(
+            "owner", sa.String(length=255), nullable=True))
+    if "heartbeat_at" not in existing:
+        # Left NULL on existing rows: unfinished ones are treated as orphaned.
+        op.add_column("scraper", sa.Column(
+            "heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scraper", "heartbeat_at")
+    op.drop_column("scraper", "owner")
@@ -1,7 +1,7 @@
 import asyncio
 from app import create_app, db
 from app.movie import Movie
-from app.scraper import Scraper
+from app.scraper import Scraper, ScraperRecord
 
 app = create_app()
 
@@ -9,4 +9,7 @@ with app.app_context():
     pass
 
 if __name__ == "__main__":
+    with app.app_context():
+        # Jobs whose owning process stopped heartbeating will never finish.
+        ScraperRecord.fail_orphaned()
     app.run(debug=True, host="0.0.0.0")
@@ -0,0 +1,118 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.image import ImageMirror
+
+# Stand-in for image.tmdb.org: fixed bytes per "/<size><image_path>", 404 otherwise.
+IMAGES = {
+    "/w500/poster.jpg": b"poster bytes",
+    "/w500/same-a.jpg": b"identical bytes",
+    "/original/same-b.jpg": b"identical bytes",
+}
+
+
+@pytest.fixture
+def image_server():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            body = IMAGES.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.requests_seen = requests_seen
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_mirror(directory, server):
+    return ImageMirror(directory=str(directory), base_url=server.base_url,
+                       poster_sizes=["w500"], backdrop_sizes=["original"],
+                       workers=2, max_requests_per_second=100, queue_size=4)
+
+
+def stored_files(directory):
+    return [os.path.join(root, name)
+            for root, _, names in os.walk(directory)
+            for name in names if name != "index.jsonl"]
+
+
+def test_downloads_image(tmp_path, image_server):
+    mirror = make_mirror(tmp_path, image_server)
+
+    path = mirror.submit_image("w500", "/poster.jpg").result()
+
+    with open(path, "rb") as f:
+        assert f.read() == b"poster bytes"
+    assert mirror.path_for("w500", "/poster.jpg") == os.path.abspath(path)
+    assert mirror.status()["downloaded"] == 1
+    assert image_server.requests_seen == ["/w500/poster.jpg"]
+
+
+def test_submit_queues_poster_and_backdrop(tmp_path, image_server):
+    mirror = make_mirror(tmp_path, image_server)
+
+    mirror.submit({"poster_path": "/poster.jpg", "backdrop_path": "/same-b.jpg"})
+    mirror.executor.shutdown(wait=True)
+
+    assert sorted(image_server.requests_seen) == [
+        "/original/same-b.jpg", "/w500/poster.jpg"]
+    assert mirror.status()["indexed"] == 2
+
+
+def test_identical_bytes_are_stored_once(tmp_path, image_server):
+    mirror = make_mirror(tmp_path, image_server)
+
+    first = mirror.submit_image("w500", "/same-a.jpg").result()
+    second = mirror.submit_image("original", "/same-b.jpg").result()
+
+    assert first == second
+    assert stored_files(tmp_path) == [first]
+    status = mirror.status()
+    assert status["downloaded"] == 1
+    assert status["deduplicated"] == 1
+    assert status["indexed"] == 2
+
+
+def test_missing_image_counts_as_failed(tmp_path, image_server):
+    mirror = make_mirror(tmp_path, image_server)
+
+    assert mirror.submit_image("w500", "/missing.jpg").result() is None
+
+    assert mirror.status()["failed"] == 1
+    assert mirror.path_for("w500", "/missing.jpg") is None
+    assert stored_files(tmp_path) == []
+
+
+def test_index_skips_already_mirrored_images(tmp_path, image_server):
+    mirror = make_mirror(tmp_path, image_server)
+    path = mirror.submit_image("w500", "/poster.jpg").result()
+    mirror.executor.shutdown(wait=True)
+    requests_before = list(image_server.requests_seen)
+
+    reloaded = make_mirror(tmp_path, image_server)
+
+    assert reloaded.submit_image("w500", "/poster.jpg") is None
+    assert image_server.requests_seen == requests_before
+    assert reloaded.status()["skipped"] == 1
+    assert reloaded.path_for("w500", "/poster.jpg") == os.path.abspath(path)
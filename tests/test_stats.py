@@ -0,0 +1,117 @@
+import logging
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.invalid import Invalid
+from app.model import BaseModel
+from app.movie import Movie
+from app.stats import (MovieLanguageStats, MovieYearStats, ensure_movie_stats,
+                       rebuild_movie_stats)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI",
+                        f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, "SQLALCHEMY_ECHO", False)
+    app = create_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def stats_snapshot():
+    return (
+        sorted((stats.stats_data() for stats in MovieLanguageStats.query), key=repr),
+        sorted((stats.stats_data() for stats in MovieYearStats.query), key=repr),
+    )
+
+
+def clear_stats():
+    MovieLanguageStats.query.delete()
+    MovieYearStats.query.delete()
+    db.session.commit()
+
+
+def test_incremental_stats_match_rebuild(app):
+    # Inserts, including null revenue/vote_average and a malformed release date.
+    Movie.upsert("id", {"id": 1, "original_language": "en", "release_date": "1999-03-31",
+                        "revenue": 100, "budget": 10, "vote_average": 7.5})
+    Movie.upsert("id", {"id": 2, "original_language": "en", "release_date": "2000-01-01",
+                        "revenue": None, "vote_average": None})
+    Movie.upsert("id", {"id": 3, "original_language": "fr", "release_date": "",
+                        "revenue": 5, "vote_average": 6.0})
+    Movie.upsert("id", {"id": 4, "original_language": None, "release_date": "20xx",
+                        "revenue": 1, "budget": 2, "vote_average": 8.25})
+    # Updates: move between language and year, null out revenue, change nothing.
+    Movie.upsert("id", {"id": 2, "original_language": "de", "release_date": "1999-12-31",
+                        "revenue": 70, "vote_average": 7.0})
+    Movie.upsert("id", {"id": 1, "revenue": None, "vote_average": None})
+    Movie.upsert("id", {"id": 3, "original_language": "fr", "release_date": ""})
+    # Delete.
+    Movie.get("id", 4).delete()
+
+    incremental = stats_snapshot()
+    rebuild_movie_stats()
+
+    assert incremental == stats_snapshot()
+    languages = {stats.original_language: stats for stats in MovieLanguageStats.query}
+    assert set(languages) == {"en", "de", "fr"}
+    assert languages["de"].movie_count == 1
+    assert languages["de"].revenue_total == 70
+    assert languages["en"].vote_average is None
+    years = {stats.year: stats for stats in MovieYearStats.query}
+    assert set(years) == {1999, None}
+    assert years[1999].movie_count == 2
+    assert years[1999].vote_average == 7.0
+
+
+def test_last_movie_leaving_a_group_drops_its_row(app):
+    Movie.upsert("id", {"id": 1, "original_language": "fr", "release_date": "2001-05-01"})
+
+    Movie.upsert("id", {"id": 1, "original_language": "it", "release_date": "2002-05-01"})
+
+    assert MovieLanguageStats.get("original_language", "fr") is None
+    assert MovieYearStats.get("year", 2001) is None
+    assert MovieLanguageStats.get("original_language", "it").movie_count == 1
+
+
+def test_missing_group_row_is_not_created_negative(app, caplog):
+    Movie.upsert("id", {"id": 1, "original_language": "fr", "release_date": "2001-05-01",
+                        "revenue": 10})
+    clear_stats()
+
+    with caplog.at_level(logging.WARNING, logger="movie_scraper"):
+        Movie.upsert("id", {"id": 1, "original_language": "de", "revenue": 10})
+
+    assert "run rebuild-stats" in caplog.text
+    assert MovieLanguageStats.get("original_language", "fr") is None
+    assert all(stats.movie_count > 0 for stats in MovieLanguageStats.query)
+    assert all(stats.movie_count > 0 for stats in MovieYearStats.query)
+
+
+def test_ensure_movie_stats_builds_empty_tables(app):
+    Movie.upsert("id", {"id": 1, "original_language": "en", "release_date": "1999-03-31",
+                        "revenue": 100, "vote_average": 7.5})
+    Movie.upsert("id", {"id": 2, "original_language": "ja", "release_date": "2010-01-01"})
+    expected = stats_snapshot()
+    clear_stats()
+
+    ensure_movie_stats()
+
+    assert stats_snapshot() == expected
+
+
+def test_untracked_models_commit_without_the_save_hook(app, monkeypatch):
+    def fail(self, previous, current):
+        raise AssertionError("_save called for a model without tracks_changes")
+
+    monkeypatch.setattr(BaseModel, "_save", fail)
+
+    invalid = Invalid.create({"movie_id": 1})
+    invalid.update({"movie_id": 2})
+    invalid.delete()
+
+    assert Invalid.query.count() == 0